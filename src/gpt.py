@@ -10,6 +10,7 @@ follows the same schema used by scheduler.py/verifier.py.
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import sys
 from pathlib import Path
@@ -17,6 +18,23 @@ from typing import Any, Dict
 
 from openai import OpenAI
 
+try:  # orjson parses/serializes large cases much faster; fall back to stdlib json
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+except ImportError:
+
+    def _loads(data):
+        return json.loads(data)
+
+    def _dumps(obj) -> str:
+        return json.dumps(obj, indent=2)
+
 
 OUTPUT_FORMAT_HINT = {
     "status": "FEASIBLE | OPTIMAL | INFEASIBLE | ...",
@@ -59,25 +77,29 @@ Output requirements:
 
 
 def load_case(path: Path) -> Dict[str, Any]:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return _loads(path.read_bytes())
 
 
 def build_user_prompt(instance: Dict[str, Any]) -> str:
     """Compose the user message containing format guidance and the test case."""
     return (
         "Output format example:\n"
-        f"{json.dumps(OUTPUT_FORMAT_HINT, indent=2)}\n\n"
+        f"{_dumps(OUTPUT_FORMAT_HINT)}\n\n"
         "Test case to solve:\n"
-        f"{json.dumps(instance, indent=2)}\n\n"
+        f"{_dumps(instance)}\n\n"
         "Return only JSON for the solution."
     )
 
 
+@functools.lru_cache(maxsize=1)
+def _client() -> OpenAI:
+    """Lazy singleton so batch callers reuse one HTTP connection pool."""
+    return OpenAI(max_retries=3)
+
+
 def call_gpt(model: str, prompt: str, temperature: float) -> str:
     """Send the prompt to GPT and return the raw text response."""
-    client = OpenAI()
-    response = client.responses.create(
+    response = _client().responses.create(
         model=model,
         instructions=SYSTEM_PROMPT.strip(),
         input=prompt,
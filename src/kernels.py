@@ -0,0 +1,73 @@
+"""
+Hot numeric kernels for the scheduler, JIT-compiled with Numba when available.
+
+Numba is an optional dependency; without it the pure-NumPy fallbacks below
+keep behavior identical (just slower on very large cases).
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _expand_starts_py(
+    slot_s: np.ndarray, slot_e: np.ndarray, durs: np.ndarray, step: int
+):
+    """Pure-NumPy fallback for expand_starts."""
+    offsets = np.zeros(durs.size + 1, dtype=np.int64)
+    chunks = []
+    for i, dur in enumerate(durs.tolist()):
+        per_slot = [
+            np.arange(s, e - dur + 1, step, dtype=np.int32)
+            for s, e in zip(slot_s.tolist(), slot_e.tolist())
+            if e - dur >= s
+        ]
+        arr = np.concatenate(per_slot) if per_slot else np.empty(0, dtype=np.int32)
+        chunks.append(arr)
+        offsets[i + 1] = offsets[i] + arr.size
+    starts = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int32)
+    return starts, offsets
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def expand_starts(slot_s, slot_e, durs, step):  # pragma: no cover - jitted
+        """
+        Enumerate feasible start minutes for each duration over a doctor's slots.
+
+        Returns a flat int32 array of starts plus an int64 offsets array such
+        that starts[offsets[i]:offsets[i+1]] are the candidates for durs[i].
+        """
+        n_durs = durs.shape[0]
+        n_slots = slot_s.shape[0]
+        offsets = np.zeros(n_durs + 1, dtype=np.int64)
+        for i in range(n_durs):
+            total = 0
+            dur = durs[i]
+            for j in range(n_slots):
+                span = slot_e[j] - dur - slot_s[j]
+                if span >= 0:
+                    total += span // step + 1
+            offsets[i + 1] = offsets[i] + total
+
+        starts = np.empty(offsets[n_durs], dtype=np.int32)
+        for i in range(n_durs):
+            k = offsets[i]
+            dur = durs[i]
+            for j in range(n_slots):
+                s = slot_s[j]
+                limit = slot_e[j] - dur
+                while s <= limit:
+                    starts[k] = s
+                    k += 1
+                    s += step
+        return starts, offsets
+
+else:
+    expand_starts = _expand_starts_py
@@ -9,23 +9,62 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import bisect
 import json
+import math
+import os
+from dataclasses import dataclass
 from typing import Dict, List, Tuple
 
+import numpy as np
 from ortools.sat.python import cp_model
 
+from kernels import expand_starts
+
+try:  # orjson is much faster on large cases; fall back to stdlib json
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+except ImportError:
+
+    def _loads(data):
+        return json.loads(data)
+
+    def _dumps(obj) -> str:
+        return json.dumps(obj, indent=2)
+
 
 DAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 DAY_TO_OFFSET = {day: idx * 24 * 60 for idx, day in enumerate(DAY_ORDER)}
 MINUTES_PER_DAY = 24 * 60
 
 
+# All 1440 valid HH:MM strings, precomputed so the hot parsing path is a
+# single dict hit instead of split + int conversions.
+_HHMM_CACHE = {f"{h:02d}:{m:02d}": h * 60 + m for h in range(24) for m in range(60)}
+
+
 def hhmm_to_minutes(hhmm: str) -> int:
+    cached = _HHMM_CACHE.get(hhmm)
+    if cached is not None:
+        return cached
     h, m = hhmm.split(":")
     return int(h) * 60 + int(m)
 
 
+# Formatted HH:MM for every minute of a day, so emitting a solution is a
+# table lookup instead of integer division + f-string formatting per item.
+_MIN_TO_HHMM = tuple(f"{t // 60:02d}:{t % 60:02d}" for t in range(MINUTES_PER_DAY))
+
+
 def minutes_to_hhmm(total: int) -> str:
+    if 0 <= total < MINUTES_PER_DAY:
+        return _MIN_TO_HHMM[total]
     return f"{total // 60:02d}:{total % 60:02d}"
 
 
@@ -35,21 +74,40 @@ def minutes_to_day_hhmm(total: int) -> Tuple[str, str]:
     if day_idx < 0 or day_idx >= len(DAY_ORDER):
         raise ValueError(f"Minutes value {total} maps to invalid day index {day_idx}")
     day = DAY_ORDER[day_idx]
-    hhmm = minutes_to_hhmm(total % MINUTES_PER_DAY)
+    hhmm = _MIN_TO_HHMM[total % MINUTES_PER_DAY]
     return day, hhmm
 
 
 def parse_case(path: str) -> Dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(path, "rb") as f:
+        return _loads(f.read())
+
+
+@dataclass
+class FeasTable:
+    """Structure-of-arrays table of feasible starts, grouped by (duration, doctor).
+
+    start_min holds all feasible start minutes contiguously; the group for
+    duration index i and doctor index j is the slice delimited by
+    group_offset[i * len(doc_ids) + j : ... + 1].
+    """
+
+    durs: List[int]  # unique durations, sorted
+    doc_ids: List[str]
+    group_offset: np.ndarray  # int64 prefix sums, len(durs) * len(doc_ids) + 1
+    start_min: np.ndarray  # int32 flat feasible start minutes
+
+    def starts(self, dur_ix: int, doc_ix: int) -> np.ndarray:
+        g = dur_ix * len(self.doc_ids) + doc_ix
+        return self.start_min[self.group_offset[g] : self.group_offset[g + 1]]
 
 
 def build_feasible_starts(
     doctors: List[Dict], patients: List[Dict], step: int
-) -> Tuple[Dict, Dict, Dict]:
+) -> Tuple[FeasTable, Dict, Dict]:
     """
     Returns:
-      feasible[p_id][d_id] -> list of (start_min, end_min) with day offset applied
+      feas -> FeasTable of feasible start minutes (day offset applied) per (duration, doctor)
       doc_intervals[d_id] -> list of (start_min, end_min) availability with day offset applied
       durations[p_id] -> duration minutes
     """
@@ -69,102 +127,290 @@ def build_feasible_starts(
                 slots.append((offset + s, offset + e))
         doc_intervals[doc["id"]] = slots
 
-    feasible: Dict[str, Dict[str, List[Tuple[int, int]]]] = {
-        p["id"]: {doc["id"]: [] for doc in doctors} for p in patients
-    }
+    # For count maximization any schedule can be compacted so every visit
+    # starts at a slot boundary plus a sum of durations, so candidates only
+    # need the granularity of the duration gcd; coarsen the step accordingly.
+    if durations:
+        step = max(step, math.gcd(*durations.values()))
+
+    # Patients sharing a duration have identical feasible-start sets per
+    # doctor, so enumerate once per (doctor, unique duration).
+    unique_durs = sorted(set(durations.values()))
+    doc_ids = [doc["id"] for doc in doctors]
+    n_docs = len(doc_ids)
+    durs_arr = np.array(unique_durs, dtype=np.int32)
+
+    chunks: List[np.ndarray] = [np.empty(0, dtype=np.int32)] * (len(unique_durs) * n_docs)
+    for doc_ix, did in enumerate(doc_ids):
+        slots = doc_intervals[did]
+        slot_s = np.array([s for s, _ in slots], dtype=np.int32)
+        slot_e = np.array([e for _, e in slots], dtype=np.int32)
+        starts_flat, offsets = expand_starts(slot_s, slot_e, durs_arr, step)
+        for dur_ix in range(len(unique_durs)):
+            chunks[dur_ix * n_docs + doc_ix] = np.sort(
+                starts_flat[offsets[dur_ix] : offsets[dur_ix + 1]]
+            )
 
-    for p in patients:
-        pid = p["id"]
-        dur = durations[pid]
-        for doc in doctors:
-            did = doc["id"]
-            for (s, e) in doc_intervals[did]:
-                start = s
-                while start + dur <= e:
-                    feasible[pid][did].append((start, start + dur))
-                    start += step
+    group_offset = np.zeros(len(chunks) + 1, dtype=np.int64)
+    if chunks:
+        np.cumsum(
+            np.fromiter((c.size for c in chunks), dtype=np.int64, count=len(chunks)),
+            out=group_offset[1:],
+        )
+        start_min = np.concatenate(chunks)
+    else:
+        start_min = np.empty(0, dtype=np.int32)
 
-    return feasible, doc_intervals, durations
+    feas = FeasTable(
+        durs=unique_durs, doc_ids=doc_ids, group_offset=group_offset, start_min=start_min
+    )
+    return feas, doc_intervals, durations
 
 
-def solve(instance: Dict, step: int = 5, time_limit_s: int | None = None) -> Dict:
+def _format_scheduled(
+    chosen: Dict[str, Tuple[str, int, int]], durations: Dict[str, int]
+) -> List[Dict]:
+    scheduled = []
+    for pid, (did, s, e) in chosen.items():
+        day, start_hhmm = minutes_to_day_hhmm(s)
+        _, end_hhmm = minutes_to_day_hhmm(e)
+        scheduled.append(
+            {
+                "patient_id": pid,
+                "doctor_id": did,
+                "day": day,
+                "start": start_hhmm,
+                "end": end_hhmm,
+                "duration_minutes": durations[pid],
+            }
+        )
+    scheduled.sort(key=lambda x: (x["doctor_id"], x["start"]))
+    return scheduled
+
+
+def greedy_assign(
+    patients: List[Dict], durations: Dict[str, int], feas: FeasTable
+) -> Dict[str, Tuple[str, int, int]] | None:
+    """First-fit-decreasing placement over the feasible-start table.
+
+    Returns pid -> (doctor_id, start, end) covering every patient, or None
+    if the greedy pass cannot place someone (caller falls back to CP-SAT).
+    """
+    dur_index = {dur: i for i, dur in enumerate(feas.durs)}
+    busy: Dict[str, Tuple[List[int], List[int]]] = {did: ([], []) for did in feas.doc_ids}
+    chosen: Dict[str, Tuple[str, int, int]] = {}
+
+    for p in sorted(patients, key=lambda x: -int(x["duration_minutes"])):
+        pid = p["id"]
+        dur = durations[pid]
+        dur_ix = dur_index[dur]
+        best: Tuple[str, int] | None = None
+        for doc_ix, did in enumerate(feas.doc_ids):
+            starts_l, ends_l = busy[did]
+            for s in feas.starts(dur_ix, doc_ix).tolist():
+                i = bisect.bisect_right(starts_l, s)
+                if i > 0 and ends_l[i - 1] > s:
+                    continue
+                if i < len(starts_l) and starts_l[i] < s + dur:
+                    continue
+                if best is None or s < best[1]:
+                    best = (did, s)
+                break
+        if best is None:
+            return None
+        did, s = best
+        starts_l, ends_l = busy[did]
+        i = bisect.bisect_right(starts_l, s)
+        starts_l.insert(i, s)
+        ends_l.insert(i, s + dur)
+        chosen[pid] = (did, s, s + dur)
+
+    return chosen
+
+
+class _AnytimeWriter(cp_model.CpSolverSolutionCallback):
+    """Write the best-so-far schedule to a file on every improving solution."""
+
+    def __init__(self, extract_schedule, num_patients: int, output_path: str):
+        super().__init__()
+        self._extract_schedule = extract_schedule
+        self._num_patients = num_patients
+        self._output_path = output_path
+
+    def OnSolutionCallback(self) -> None:
+        scheduled, unscheduled = self._extract_schedule(self.Value)
+        payload = _dumps(
+            {
+                "status": "FEASIBLE",
+                "objective_value": self._num_patients - int(self.ObjectiveValue()),
+                "scheduled": scheduled,
+                "unscheduled": unscheduled,
+            }
+        )
+        tmp_path = f"{self._output_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, self._output_path)
+
+
+def solve(
+    instance: Dict,
+    step: int = 5,
+    time_limit_s: int | None = None,
+    workers: int | None = None,
+    linearization: int = 2,
+    log_search: bool | None = None,
+    anytime_output: str | None = None,
+    stop_after_first: bool = False,
+) -> Dict:
     doctors = instance["doctors"]
     patients = instance["patients"]
 
-    feasible, doc_intervals, durations = build_feasible_starts(doctors, patients, step)
-    model = cp_model.CpModel()
+    feas, doc_intervals, durations = build_feasible_starts(doctors, patients, step)
+
+    # When capacity comfortably exceeds demand a greedy first-fit-decreasing
+    # pass often schedules everyone; that is already optimal for the
+    # count-maximization objective, so skip CP-SAT entirely.
+    total_avail = sum(e - s for slots in doc_intervals.values() for s, e in slots)
+    if total_avail >= 2 * sum(durations.values()):
+        chosen = greedy_assign(patients, durations, feas)
+        if chosen is not None:
+            return {
+                "status": "OPTIMAL",
+                "objective_value": len(patients),
+                "scheduled": _format_scheduled(chosen, durations),
+                "unscheduled": [],
+            }
 
-    # Decision variables: optional interval per (patient, doctor, start)
-    intervals_by_doc: Dict[str, List[cp_model.IntervalVar]] = {d["id"]: [] for d in doctors}
-    presence_vars: Dict[Tuple[str, str, int], cp_model.IntVar] = {}
-    starts_vars: Dict[Tuple[str, str, int], cp_model.IntVar] = {}
+    model = cp_model.CpModel()
 
+    # Patients with the same duration are interchangeable, so model one
+    # "copy" per class member instead of per concrete patient and map
+    # scheduled copies back to patient ids after solving. Sharing the start
+    # domains per (duration, doctor) avoids rebuilding identical structures.
+    classes: Dict[int, List[str]] = {}
     for p in patients:
-        pid = p["id"]
-        for d in doctors:
-            did = d["id"]
-            for idx, (s, e) in enumerate(feasible[pid][did]):
-                pres = model.NewBoolVar(f"pres_{pid}_{did}_{idx}")
-                start = model.NewIntVar(s, s, f"start_{pid}_{did}_{idx}")  # fixed start
-                end = model.NewIntVar(e, e, f"end_{pid}_{did}_{idx}")      # fixed end
-                iv = model.NewOptionalIntervalVar(start, durations[pid], end, pres, f"iv_{pid}_{did}_{idx}")
-                intervals_by_doc[did].append(iv)
-                presence_vars[(pid, did, idx)] = pres
-                starts_vars[(pid, did, idx)] = start
+        classes.setdefault(durations[p["id"]], []).append(p["id"])
+    for pids in classes.values():
+        pids.sort()
 
-    # Each patient at most one placement
-    for p in patients:
-        pid = p["id"]
-        vars_for_p = [v for (pp, _, _), v in presence_vars.items() if pp == pid]
-        if vars_for_p:
-            model.Add(sum(vars_for_p) <= 1)
+    intervals_by_doc: Dict[str, List[cp_model.IntervalVar]] = {d["id"]: [] for d in doctors}
+    presence_vars: Dict[Tuple[int, int, str], cp_model.IntVar] = {}
+    starts_vars: Dict[Tuple[int, int, str], cp_model.IntVar] = {}
+    pres_by_copy: Dict[Tuple[int, int], List[cp_model.IntVar]] = {}
+
+    domains: Dict[Tuple[int, str], cp_model.Domain] = {}
+    for dur_ix, dur in enumerate(feas.durs):
+        for doc_ix, did in enumerate(feas.doc_ids):
+            starts = feas.starts(dur_ix, doc_ix)
+            if starts.size:
+                domains[(dur, did)] = cp_model.Domain.FromValues(starts.tolist())
+
+    for dur, pids in classes.items():
+        for copy in range(len(pids)):
+            for d in doctors:
+                did = d["id"]
+                domain = domains.get((dur, did))
+                if domain is None:
+                    continue
+                pres = model.NewBoolVar(f"pres_{dur}_{copy}_{did}")
+                start = model.NewIntVarFromDomain(domain, f"start_{dur}_{copy}_{did}")
+                # Fixed-size interval: no end variable/expression for presolve
+                # to carry around, the end is implied as start + dur.
+                iv = model.NewOptionalFixedSizeIntervalVar(
+                    start, dur, pres, f"iv_{dur}_{copy}_{did}"
+                )
+                intervals_by_doc[did].append(iv)
+                presence_vars[(dur, copy, did)] = pres
+                starts_vars[(dur, copy, did)] = start
+                pres_by_copy.setdefault((dur, copy), []).append(pres)
+
+    # Each class copy is either placed exactly once or explicitly unscheduled.
+    unsched: Dict[Tuple[int, int], cp_model.IntVar] = {}
+    for dur, pids in classes.items():
+        for copy in range(len(pids)):
+            u = model.NewBoolVar(f"unsched_{dur}_{copy}")
+            model.AddExactlyOne(pres_by_copy.get((dur, copy), []) + [u])
+            unsched[(dur, copy)] = u
+
+    # Symmetry breaking within a duration class: copies are interchangeable,
+    # so force scheduled copies to form a prefix and order their start times.
+    horizon = len(DAY_ORDER) * MINUTES_PER_DAY
+    for dur, pids in classes.items():
+        n = len(pids)
+        if n < 2:
+            continue
+        assigned: List[cp_model.IntVar] = []
+        for copy in range(n):
+            a = model.NewIntVar(0, horizon, f"assigned_{dur}_{copy}")
+            for d in doctors:
+                pres = presence_vars.get((dur, copy, d["id"]))
+                if pres is not None:
+                    model.Add(a == starts_vars[(dur, copy, d["id"])]).OnlyEnforceIf(pres)
+            assigned.append(a)
+        for copy in range(n - 1):
+            model.AddImplication(unsched[(dur, copy)], unsched[(dur, copy + 1)])
+            model.Add(assigned[copy] <= assigned[copy + 1]).OnlyEnforceIf(
+                [unsched[(dur, copy)].Not(), unsched[(dur, copy + 1)].Not()]
+            )
 
     # No overlap per doctor
     for d in doctors:
         did = d["id"]
         model.AddNoOverlap(intervals_by_doc[did])
 
-    # Objective: maximize number of scheduled patients (presence count)
-    model.Maximize(sum(presence_vars.values()))
+    # Objective: minimize the number of unscheduled patients (equivalent to
+    # maximizing scheduled count, but with a tighter encoding for CP-SAT)
+    model.Minimize(sum(unsched.values()))
 
     solver = cp_model.CpSolver()
     if time_limit_s:
         solver.parameters.max_time_in_seconds = float(time_limit_s)
-    solver.parameters.num_search_workers = 8
-
-    status = solver.Solve(model)
-    scheduled = []
-    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        # Pick chosen assignment per patient (at most one)
+    # Tuned profile for this assignment-with-no-overlap shape
+    solver.parameters.num_search_workers = workers if workers else max(8, os.cpu_count() or 8)
+    solver.parameters.log_search_progress = (
+        bool(os.getenv("CPSAT_LOG")) if log_search is None else log_search
+    )
+    solver.parameters.relative_gap_limit = 0.0
+    solver.parameters.cp_model_presolve = True
+    solver.parameters.linearization_level = linearization
+    solver.parameters.use_phase_saving = True
+
+    if stop_after_first:
+        solver.parameters.stop_after_first_solution = True
+
+    def extract_schedule(value) -> Tuple[List[Dict], List[str]]:
+        # Map scheduled class copies back to concrete patients; any
+        # assignment within a duration class is equivalent.
         chosen: Dict[str, Tuple[str, int, int]] = {}
-        for (pid, did, idx), pres in presence_vars.items():
-            if solver.Value(pres):
-                s = solver.Value(starts_vars[(pid, did, idx)])
-                e = s + durations[pid]
-                chosen[pid] = (did, s, e)
-
-        for pid, (did, s, e) in chosen.items():
-            day, start_hhmm = minutes_to_day_hhmm(s)
-            _, end_hhmm = minutes_to_day_hhmm(e)
-            scheduled.append(
-                {
-                    "patient_id": pid,
-                    "doctor_id": did,
-                    "day": day,
-                    "start": start_hhmm,
-                    "end": end_hhmm,
-                    "duration_minutes": durations[pid],
-                }
-            )
-
-    scheduled_ids = {item["patient_id"] for item in scheduled}
-    unscheduled = [p["id"] for p in patients if p["id"] not in scheduled_ids]
+        remaining = {dur: list(pids) for dur, pids in classes.items()}
+        for (dur, copy, did), pres in presence_vars.items():
+            if value(pres):
+                s = value(starts_vars[(dur, copy, did)])
+                pid = remaining[dur].pop(0)
+                chosen[pid] = (did, s, s + dur)
+
+        scheduled = _format_scheduled(chosen, durations)
+        unscheduled = sorted({p["id"] for p in patients} - set(chosen))
+        return scheduled, unscheduled
+
+    callback = (
+        _AnytimeWriter(extract_schedule, len(patients), anytime_output)
+        if anytime_output
+        else None
+    )
+    status = solver.Solve(model, callback) if callback else solver.Solve(model)
+
+    scheduled: List[Dict] = []
+    unscheduled = sorted(p["id"] for p in patients)
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        scheduled, unscheduled = extract_schedule(solver.Value)
 
     return {
         "status": solver.StatusName(status),
-        "objective_value": solver.ObjectiveValue() if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None,
-        "scheduled": sorted(scheduled, key=lambda x: (x["doctor_id"], x["start"])),
-        "unscheduled": sorted(unscheduled),
+        "objective_value": len(patients) - solver.ObjectiveValue() if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None,
+        "scheduled": scheduled,
+        "unscheduled": unscheduled,
     }
 
 
@@ -173,11 +419,24 @@ def main() -> None:
     parser.add_argument("--input", "-i", required=True, help="Path to JSON produced by test_case_generator.py")
     parser.add_argument("--step", type=int, default=5, help="Time discretization in minutes (default 5)")
     parser.add_argument("--time_limit", type=int, default=None, help="Optional solver time limit (seconds)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of CP-SAT search workers (default: all cores, min 8)")
+    parser.add_argument("--linearization", type=int, default=2, choices=[0, 1, 2], help="CP-SAT linearization level (default 2)")
+    parser.add_argument("--log", action="store_true", help="Log CP-SAT search progress (also via CPSAT_LOG env var)")
+    parser.add_argument("--stop_after_first", action="store_true", help="Stop at the first feasible solution")
     parser.add_argument("--output", "-o", default="-", help="Output path or '-' for stdout (default)")
     args = parser.parse_args()
     instance = parse_case(args.input)
-    result = solve(instance, step=args.step, time_limit_s=args.time_limit)
-    payload = json.dumps(result, indent=2)
+    result = solve(
+        instance,
+        step=args.step,
+        time_limit_s=args.time_limit,
+        workers=args.workers,
+        linearization=args.linearization,
+        log_search=args.log or None,
+        anytime_output=args.output if args.output != "-" else None,
+        stop_after_first=args.stop_after_first,
+    )
+    payload = _dumps(result)
 
     if args.output == "-":
         print(payload)
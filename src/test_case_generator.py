@@ -9,11 +9,26 @@ from __future__ import annotations
 
 import argparse
 import json
-import random
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from typing import List, Tuple
 
+import numpy as np
+
+try:  # orjson serializes large cases much faster; fall back to stdlib json
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+except ImportError:
+
+    def _dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
 DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
 
@@ -43,6 +58,7 @@ def minutes_to_str(total_minutes: int) -> str:
 
 
 def generate_day_slots(
+    rng: np.random.Generator,
     day: str,
     max_slots: int,
     min_start: int = 8 * 60,
@@ -52,15 +68,22 @@ def generate_day_slots(
     step: int = 15,
 ) -> List[AvailabilitySlot]:
     """Generate non-overlapping availability slots for a single day."""
-    slots: List[Tuple[int, int]] = []
-    attempts = 0
-    target_slots = random.randint(0, max_slots)
+    target_slots = int(rng.integers(0, max_slots + 1))
+    if target_slots == 0:
+        return []
     max_attempts = max(20, target_slots * 10)
 
-    while len(slots) < target_slots and attempts < max_attempts:
-        attempts += 1
-        start = random.randrange(min_start, max_end - min_length + 1, step)
-        length = random.randrange(min_length, max_length + step, step)
+    # Draw all candidate (start, length) pairs in one batched call each;
+    # the accept/reject pass below just filters them.
+    n_starts = (max_end - min_length - min_start) // step + 1
+    n_lengths = (max_length + step - min_length + step - 1) // step
+    starts = min_start + rng.integers(0, n_starts, size=max_attempts) * step
+    lengths = min_length + rng.integers(0, n_lengths, size=max_attempts) * step
+
+    slots: List[Tuple[int, int]] = []
+    for start, length in zip(starts.tolist(), lengths.tolist()):
+        if len(slots) >= target_slots:
+            break
         end = min(start + length, max_end)
         if end - start < min_length:
             continue
@@ -74,30 +97,65 @@ def generate_day_slots(
     return [AvailabilitySlot(day=day, start=minutes_to_str(s), end=minutes_to_str(e)) for s, e in slots]
 
 
-def generate_doctors(num_doctors: int) -> List[Doctor]:
+# Below this many doctors the process-pool startup cost outweighs the win.
+_PARALLEL_THRESHOLD = 256
+
+# Doctors are always generated in this many fixed chunks, each with its own
+# spawned SeedSequence, so a given seed yields the same case on any machine
+# and regardless of whether the chunks run serially or on a process pool.
+_N_CHUNKS = 32
+
+
+def _gen_doctor_chunk(lo: int, hi: int, seed_seq: np.random.SeedSequence) -> List[Doctor]:
+    rng = np.random.default_rng(seed_seq)
     doctors: List[Doctor] = []
-    for i in range(num_doctors):
+    for i in range(lo, hi):
         availability: List[AvailabilitySlot] = []
         for day in DAY_NAMES:
-            availability.extend(generate_day_slots(day, max_slots=3))
+            availability.extend(generate_day_slots(rng, day, max_slots=3))
         doctors.append(Doctor(id=f"doctor_{i+1}", availability=availability))
     return doctors
 
 
-def generate_patients(num_patients: int) -> List[Patient]:
-    patients: List[Patient] = []
-    for i in range(num_patients):
-        duration = random.choice([15, 30, 45, 60, 75, 90, 105, 120])
-        patients.append(Patient(id=f"patient_{i+1}", duration_minutes=duration))
-    return patients
+def generate_doctors(num_doctors: int, seed_seq: np.random.SeedSequence) -> List[Doctor]:
+    n_chunks = max(1, min(_N_CHUNKS, num_doctors))
+    bounds = [num_doctors * c // n_chunks for c in range(n_chunks + 1)]
+    chunk_seeds = seed_seq.spawn(n_chunks)
+
+    n_workers = os.cpu_count() or 1
+    if num_doctors < _PARALLEL_THRESHOLD or n_workers == 1:
+        return [
+            doc
+            for c in range(n_chunks)
+            for doc in _gen_doctor_chunk(bounds[c], bounds[c + 1], chunk_seeds[c])
+        ]
+
+    # The executor merely distributes the fixed chunks over available cores;
+    # chunk count and seeds never depend on cpu_count, so output matches the
+    # serial path byte for byte.
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [
+            executor.submit(_gen_doctor_chunk, bounds[c], bounds[c + 1], chunk_seeds[c])
+            for c in range(n_chunks)
+        ]
+        return [doc for fut in futures for doc in fut.result()]
+
+
+def generate_patients(num_patients: int, rng: np.random.Generator) -> List[Patient]:
+    choices = np.array([15, 30, 45, 60, 75, 90, 105, 120])
+    durations = choices[rng.integers(0, len(choices), size=num_patients)]
+    return [
+        Patient(id=f"patient_{i+1}", duration_minutes=int(duration))
+        for i, duration in enumerate(durations.tolist())
+    ]
 
 
 def generate_test_case(num_doctors: int, num_patients: int, seed: int | None = None) -> dict:
-    if seed is not None:
-        random.seed(seed)
+    seed_seq = np.random.SeedSequence(seed)
+    doctor_seq, patient_seq = seed_seq.spawn(2)
 
-    doctors = generate_doctors(num_doctors)
-    patients = generate_patients(num_patients)
+    doctors = generate_doctors(num_doctors, doctor_seq)
+    patients = generate_patients(num_patients, np.random.default_rng(patient_seq))
     return {
         "meta": {
             "seed": seed,
@@ -127,7 +185,7 @@ def parse_args() -> argparse.Namespace:
 def main() -> None:
     args = parse_args()
     data = generate_test_case(args.doctors, args.patients, args.seed)
-    payload = json.dumps(data, ensure_ascii=False, indent=2)
+    payload = _dumps(data)
 
     if args.output == "-":
         print(payload)
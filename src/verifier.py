@@ -11,19 +11,45 @@ from __future__ import annotations
 import argparse
 import json
 import sys
+from collections import Counter
 from typing import Any, Dict, List, Tuple
 
+import numpy as np
+
+try:  # orjson is much faster on large solutions; fall back to stdlib json
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+except ImportError:
+
+    def _loads(data):
+        return json.loads(data)
+
+
 DAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 DAY_TO_OFFSET = {day: idx * 24 * 60 for idx, day in enumerate(DAY_ORDER)}
 MINUTES_PER_DAY = 24 * 60
 
 
 def parse_json(path: str) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(path, "rb") as f:
+        return _loads(f.read())
+
+
+# All 1440 valid HH:MM strings; a dict hit covers well-formed times so the
+# parse/validate branch only runs for malformed input.
+_HHMM_CACHE = {f"{h:02d}:{m:02d}": h * 60 + m for h in range(24) for m in range(60)}
+
+_DAY_OFFSET = DAY_TO_OFFSET.get
 
 
 def hhmm_to_minutes(hhmm: str) -> int:
+    cached = _HHMM_CACHE.get(hhmm)
+    if cached is not None:
+        return cached
+
     try:
         h_str, m_str = hhmm.split(":")
         h = int(h_str)
@@ -37,9 +63,10 @@ def hhmm_to_minutes(hhmm: str) -> int:
 
 
 def to_absolute_minutes(day: str, hhmm: str) -> int:
-    if day not in DAY_TO_OFFSET:
+    offset = _DAY_OFFSET(day)
+    if offset is None:
         raise ValueError(f"Unknown day '{day}'. Expected one of {DAY_ORDER}")
-    return DAY_TO_OFFSET[day] + hhmm_to_minutes(hhmm)
+    return offset + hhmm_to_minutes(hhmm)
 
 
 def build_availability(doctors: List[Dict[str, Any]]) -> Tuple[Dict[str, List[Tuple[int, int]]], List[str]]:
@@ -72,7 +99,14 @@ def build_availability(doctors: List[Dict[str, Any]]) -> Tuple[Dict[str, List[Tu
     return availability, errors
 
 
+# Formatted HH:MM for every minute of a day; diagnostics index this table
+# instead of re-formatting per entry.
+_MIN_TO_HHMM = tuple(f"{t // 60:02d}:{t % 60:02d}" for t in range(MINUTES_PER_DAY))
+
+
 def minutes_to_str(total: int) -> str:
+    if 0 <= total < MINUTES_PER_DAY:
+        return _MIN_TO_HHMM[total]
     return f"{total // 60:02d}:{total % 60:02d}"
 
 
@@ -94,6 +128,18 @@ def verify(instance: Dict[str, Any], solution: Dict[str, Any], enforce_step: int
     availability, avail_errors = build_availability(doctors)
     errors.extend(avail_errors)
 
+    # Sorted per-doctor slot arrays (with a running max over ends) so the
+    # containment check per scheduled item is a binary search, not a scan.
+    availability_np: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    for avail_did, avail_slots in availability.items():
+        if avail_slots:
+            arr = np.array(avail_slots, dtype=np.int32)
+            order = np.argsort(arr[:, 0], kind="stable")
+            availability_np[avail_did] = (
+                arr[order, 0],
+                np.maximum.accumulate(arr[order, 1]),
+            )
+
     scheduled_entries = solution.get("scheduled", [])
     unscheduled_entries = solution.get("unscheduled", [])
 
@@ -141,10 +187,13 @@ def verify(instance: Dict[str, Any], solution: Dict[str, Any], enforce_step: int
             if start % enforce_step != 0 or end % enforce_step != 0:
                 errors.append(f"{ctx}: start/end must align to {enforce_step}-minute step.")
 
-        slots = availability.get(did, [])
-        if slots and not any(start >= s and end <= e for s, e in slots):
-            friendly = ", ".join([f"{minutes_to_str(s % MINUTES_PER_DAY)}-{minutes_to_str(e % MINUTES_PER_DAY)} {DAY_ORDER[s // MINUTES_PER_DAY]}" for s, e in slots])
-            errors.append(f"{ctx}: interval {day} {start_str}-{end_str} not within doctor '{did}' availability ({friendly}).")
+        if did in availability_np:
+            starts_arr, max_ends_arr = availability_np[did]
+            i = int(np.searchsorted(starts_arr, start, side="right")) - 1
+            if i < 0 or end > int(max_ends_arr[i]):
+                slots = availability[did]
+                friendly = ", ".join([f"{minutes_to_str(s % MINUTES_PER_DAY)}-{minutes_to_str(e % MINUTES_PER_DAY)} {DAY_ORDER[s // MINUTES_PER_DAY]}" for s, e in slots])
+                errors.append(f"{ctx}: interval {day} {start_str}-{end_str} not within doctor '{did}' availability ({friendly}).")
 
         if pid in seen_patients:
             prev_ctx, prev_did = seen_patients[pid]
@@ -154,26 +203,32 @@ def verify(instance: Dict[str, Any], solution: Dict[str, Any], enforce_step: int
 
         doc_intervals.setdefault(did, []).append((start, end, pid))
 
-    # Overlap checks per doctor
+    # Overlap checks per doctor: sort and compare at C level, then format
+    # diagnostics only for the (rare) offending pairs.
     for did, intervals in doc_intervals.items():
-        intervals.sort(key=lambda x: x[0])
-        for i in range(1, len(intervals)):
-            prev_start, prev_end, prev_pid = intervals[i - 1]
-            curr_start, curr_end, curr_pid = intervals[i]
-            if curr_start < prev_end:
-                errors.append(
-                    f"doctor '{did}' has overlapping patients '{prev_pid}' ({minutes_to_str(prev_start % MINUTES_PER_DAY)}-{minutes_to_str(prev_end % MINUTES_PER_DAY)}) "
-                    f"and '{curr_pid}' ({minutes_to_str(curr_start % MINUTES_PER_DAY)}-{minutes_to_str(curr_end % MINUTES_PER_DAY)})."
-                )
-
-    # Unscheduled list validation
-    unscheduled_set = set()
-    for idx, pid in enumerate(unscheduled_entries):
-        if pid in unscheduled_set:
-            errors.append(f"unscheduled[{idx}]: patient '{pid}' listed multiple times.")
-        unscheduled_set.add(pid)
-        if pid not in patient_durations:
-            errors.append(f"unscheduled[{idx}]: patient '{pid}' not found in test case.")
+        if len(intervals) < 2:
+            continue
+        arr = np.array([(s, e) for s, e, _ in intervals], dtype=np.int32)
+        order = np.argsort(arr[:, 0], kind="stable")
+        arr = arr[order]
+        pids = np.array([pid for _, _, pid in intervals], dtype=object)[order]
+        mask = arr[1:, 0] < arr[:-1, 1]
+        for i in np.nonzero(mask)[0]:
+            prev_start, prev_end = int(arr[i, 0]), int(arr[i, 1])
+            curr_start, curr_end = int(arr[i + 1, 0]), int(arr[i + 1, 1])
+            errors.append(
+                f"doctor '{did}' has overlapping patients '{pids[i]}' ({minutes_to_str(prev_start % MINUTES_PER_DAY)}-{minutes_to_str(prev_end % MINUTES_PER_DAY)}) "
+                f"and '{pids[i + 1]}' ({minutes_to_str(curr_start % MINUTES_PER_DAY)}-{minutes_to_str(curr_end % MINUTES_PER_DAY)})."
+            )
+
+    # Unscheduled list validation: one Counter pass for duplicates and set
+    # difference for unknown ids instead of per-entry membership checks.
+    unscheduled_set = set(unscheduled_entries)
+    for pid, count in Counter(unscheduled_entries).items():
+        if count > 1:
+            errors.append(f"unscheduled: patient '{pid}' listed {count} times.")
+    for pid in sorted(unscheduled_set - set(patient_durations)):
+        errors.append(f"unscheduled: patient '{pid}' not found in test case.")
 
     # Coverage validation
     scheduled_set = set(seen_patients.keys())
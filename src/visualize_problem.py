@@ -8,31 +8,182 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import atexit
+import base64
+import functools
+import gzip
+import hashlib
 import json
+import os
+import sys
+import tempfile
 from pathlib import Path
 from typing import Any, Dict
 
-from flask import Flask, Response, jsonify, render_template_string
+import numpy as np
+from flask import Flask, Response, request, send_file
+from jinja2 import Template
+
+try:  # orjson parses/serializes large cases much faster; fall back to stdlib json
+    import orjson
+
+    def _loads(data: bytes):
+        return orjson.loads(data)
+
+    def _dump_bytes(obj) -> bytes:
+        return orjson.dumps(obj)
+
+except ImportError:
+
+    def _loads(data: bytes):
+        return json.loads(data)
+
+    def _dump_bytes(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _hhmm_to_minutes(hhmm: str) -> int:
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+
+# d3.schemeTableau10, assigned round-robin server-side so the browser does a
+# plain dict read per slot instead of ordinal-scale lookups.
+_TABLEAU10 = [
+    "#4e79a7", "#f28e2c", "#e15759", "#76b7b2", "#59a14f",
+    "#edc949", "#af7aa1", "#ff9da7", "#9c755f", "#bab0ab",
+]
+
+
+_DAY_ORDER = {
+    day: i
+    for i, day in enumerate(
+        ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    )
+}
+
+
+def _b64(arr: np.ndarray) -> str:
+    return base64.b64encode(arr.tobytes()).decode("ascii")
+
+
+def _preprocess_case(test_case: Dict[str, Any]) -> Dict[str, Any]:
+    """Repack availability into base64-encoded columnar minute/index arrays.
+
+    The browser decodes these straight into TypedArrays (a few bytes per
+    slot instead of a keyed JSON object), so renderSlots iterates by index
+    with no per-slot object allocation. Explicit little-endian dtypes match
+    what Uint16Array assumes on every mainstream platform.
+    """
+    out = dict(test_case)
+    doctors = test_case.get("doctors", [])
+    doctor_ids = [doc["id"] for doc in doctors]
+    flat = [(di, slot) for di, doc in enumerate(doctors) for slot in doc.get("availability", [])]
+    days = sorted(
+        dict.fromkeys(slot["day"] for _, slot in flat),
+        key=lambda d: _DAY_ORDER.get(d, len(_DAY_ORDER)),
+    )
+    day_ix = {d: i for i, d in enumerate(days)}
+    out.pop("doctors", None)
+    out["slot_cols"] = {
+        "days": days,
+        "doctor_ids": doctor_ids,
+        "start_min_b64": _b64(np.array([_hhmm_to_minutes(s["start"]) for _, s in flat], dtype="<u2")),
+        "end_min_b64": _b64(np.array([_hhmm_to_minutes(s["end"]) for _, s in flat], dtype="<u2")),
+        "day_idx_b64": _b64(np.array([day_ix[s["day"]] for _, s in flat], dtype=np.uint8)),
+        "doc_idx_b64": _b64(np.array([di for di, _ in flat], dtype="<u2")),
+    }
+    out["_color_map"] = {did: _TABLEAU10[i % len(_TABLEAU10)] for i, did in enumerate(doctor_ids)}
+    return out
+
+
+@functools.lru_cache(maxsize=8)
+def _load_cached(path_str: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    # mtime_ns/size key the cache so a rewritten file is re-read; under
+    # --debug reloads the same unchanged input parses only once.
+    return _loads(Path(path_str).read_bytes())
 
 
 def load_case(path: Path) -> Dict[str, Any]:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    stat = path.stat()
+    return _load_cached(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+# Self-hosted D3 (see src/static/README.md) skips the CDN round trip on
+# first paint; fall back to jsdelivr when the local file is absent.
+_D3_LOCAL = Path(__file__).resolve().parent / "static" / "d3.v7.min.js"
+_D3_CDN = "https://cdn.jsdelivr.net/npm/d3@7"
 
 
 def create_app(test_case: Dict[str, Any]) -> Flask:
     app = Flask(__name__)
+    # The d3 bundle is versioned in its filename, so let clients keep it.
+    app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 31536000
+
+    # The case is immutable for the process lifetime: preprocess and
+    # serialize once, and answer conditional requests with 304 instead of
+    # resending the body.
+    payload = _dump_bytes(_preprocess_case(test_case))
+    # Availability JSON is highly compressible (repeated keys, HH:MM strings),
+    # so keep a gzip variant for clients that accept it.
+    gz_payload = gzip.compress(payload, compresslevel=6)
+    etag = hashlib.sha256(payload).hexdigest()
+
+    # Spool both variants to tempfiles so send_file can hand the body to
+    # the WSGI server's wsgi.file_wrapper -- sendfile(2) on Linux, i.e.
+    # zero-copy from page cache to socket with no Python-side chunking.
+    def _spool(data: bytes, suffix: str) -> str:
+        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+        tmp.write(data)
+        tmp.close()
+        atexit.register(os.unlink, tmp.name)
+        return tmp.name
+
+    payload_path = _spool(payload, ".json")
+    gz_path = _spool(gz_payload, ".json.gz")
 
     @app.get("/data")
     def data() -> Response:
-        return jsonify(test_case)
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            resp = send_file(gz_path, mimetype="application/json", etag=etag, conditional=True)
+            resp.headers["Content-Encoding"] = "gzip"
+        else:
+            resp = send_file(payload_path, mimetype="application/json", etag=etag, conditional=True)
+        resp.headers["Cache-Control"] = "public, max-age=3600"
+        resp.headers["Vary"] = "Accept-Encoding"
+        return resp
+
+    # The template values are fixed per process, so render the page once.
+    rendered = _TEMPLATE.render(
+        meta=test_case.get("meta", {}),
+        d3_src="/static/d3.v7.min.js" if _D3_LOCAL.exists() else _D3_CDN,
+    )
+    index_etag = hashlib.sha256(rendered.encode("utf-8")).hexdigest()
 
     @app.get("/")
-    def index() -> str:
-        return render_template_string(
-            HTML_TEMPLATE,
-            meta=test_case.get("meta", {}),
-        )
+    def index() -> Response:
+        if index_etag in request.if_none_match:
+            return Response(status=304, headers={"ETag": index_etag})
+        return Response(rendered, mimetype="text/html", headers={"ETag": index_etag})
+
+    # WSGI-level fast path for conditional hits only: a matching
+    # If-None-Match on GET /data is answered before Flask routing, request
+    # context push/pop and signal dispatch even run. Full-body responses
+    # fall through to the send_file route above so they still go out via
+    # sendfile(2).
+    wsgi_fallback = app.wsgi_app
+
+    def _data_fastpath(environ, start_response):
+        if (
+            environ.get("PATH_INFO") == "/data"
+            and environ.get("REQUEST_METHOD") == "GET"
+            and etag in environ.get("HTTP_IF_NONE_MATCH", "")
+        ):
+            start_response("304 Not Modified", [("ETag", etag)])
+            return [b""]
+        return wsgi_fallback(environ, start_response)
+
+    app.wsgi_app = _data_fastpath
 
     return app
 
@@ -43,6 +194,12 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--host", default="127.0.0.1", help="Host to bind. Default: 127.0.0.1")
     parser.add_argument("--port", type=int, default=9000, help="Port to bind. Default: 9000")
     parser.add_argument("--debug", action="store_true", help="Run Flask debug mode.")
+    parser.add_argument(
+        "--serve",
+        choices=["dev", "waitress", "gunicorn"],
+        default="waitress",
+        help="WSGI server to use (default: waitress; dev server is single-threaded).",
+    )
     return parser.parse_args()
 
 
@@ -52,7 +209,7 @@ HTML_TEMPLATE = """
 <head>
   <meta charset="utf-8" />
   <title>Doctor Availability</title>
-  <script src="https://cdn.jsdelivr.net/npm/d3@7"></script>
+  <script src="{{ d3_src }}"></script>
   <style>
     body { font-family: system-ui, -apple-system, sans-serif; margin: 0; padding: 0; background: #f7f7f7; }
     header { padding: 12px 16px; background: #0f172a; color: #e2e8f0; }
@@ -84,6 +241,8 @@ HTML_TEMPLATE = """
     <div id="controls">
       <label for="doctorSelect">Doctor:</label>
       <select id="doctorSelect"></select>
+      <label for="minPx">Min slot px:</label>
+      <input type="number" id="minPx" value="1.5" min="0" step="0.5" style="width: 60px" />
       <span id="summary"></span>
     </div>
     <div id="chart"></div>
@@ -98,6 +257,10 @@ HTML_TEMPLATE = """
     const margin = { top: 30, right: 20, bottom: 40, left: 70 };
     const dayPadding = 6;
 
+    // Clamp emitted SVG coordinates to 2 decimals; full-precision floats
+    // bloat attribute strings for no visual gain.
+    const fmt = v => Math.round(v * 100) / 100;
+
     const tooltip = d3.select("#tooltip");
     const chart = d3.select("#chart")
       .append("svg")
@@ -115,64 +278,64 @@ HTML_TEMPLATE = """
       .then(resp => resp.json())
       .then(draw);
 
-    function timeToMinutes(str) {
-      const [h, m] = str.split(":").map(Number);
-      return h * 60 + m;
-    }
-
     function draw(data) {
-      const doctors = data.doctors || [];
-      const slots = doctors.flatMap(doc => (doc.availability || []).map(s => ({
-        doctorId: doc.id,
-        day: s.day,
-        start: timeToMinutes(s.start),
-        end: timeToMinutes(s.end),
-      })));
-
-      const startMin = d3.min(slots, d => d.start) ?? 8 * 60;
-      const endMax = d3.max(slots, d => d.end) ?? 18 * 60;
+      const cols = data.slot_cols || {};
+
+      // Columnar payload: base64 little-endian arrays decode straight into
+      // TypedArrays -- no per-slot JS objects, index-based loops below.
+      const b64ToBytes = s => Uint8Array.from(atob(s || ""), c => c.charCodeAt(0));
+      const starts = new Uint16Array(b64ToBytes(cols.start_min_b64).buffer);
+      const ends = new Uint16Array(b64ToBytes(cols.end_min_b64).buffer);
+      const dayIdx = b64ToBytes(cols.day_idx_b64);
+      const docIdx = new Uint16Array(b64ToBytes(cols.doc_idx_b64).buffer);
+      const slotDays = cols.days || [];
+      const doctors = cols.doctor_ids || [];
+      const n = starts.length;
+
+      const startMin = d3.min(starts) ?? 8 * 60;
+      const endMax = d3.max(ends) ?? 18 * 60;
       const yScale = d3.scaleLinear().domain([startMin, endMax]).range([0, innerHeight]);
 
+      // Band offsets are fixed once the domain is known; store them in a
+      // typed array indexed by the payload's numeric day index, so the
+      // per-slot hot path is a plain array load -- no hashing, no
+      // nullish-coalescing branch.
+      const xOffsets = Float32Array.from(slotDays, d => xScale(d) ?? 0);
+
       const hours = d3.range(Math.floor(startMin / 60), Math.ceil(endMax / 60) + 1);
 
-      // Axes and grid
-      plotArea.append("g")
+      // Axes and grid: all hour lines collapse into a single <path>
+      plotArea.append("path")
         .attr("class", "grid")
-        .selectAll("line")
-        .data(hours)
-        .join("line")
-        .attr("x1", 0)
-        .attr("x2", innerWidth)
-        .attr("y1", d => yScale(d * 60))
-        .attr("y2", d => yScale(d * 60));
+        .attr("fill", "none")
+        .attr("stroke", "#e2e8f0")
+        .attr("d", hours.map(h => `M0,${fmt(yScale(h * 60))}H${innerWidth}`).join(""));
 
       plotArea.append("g")
         .attr("class", "axis")
-        .call(d3.axisLeft(yScale).tickValues(hours.map(h => h * 60)).tickFormat(d => `${String(Math.floor(d / 60)).padStart(2, "0")}:00`));
+        .call(d3.axisLeft(yScale).tickSizeOuter(0).tickValues(hours.map(h => h * 60)).tickFormat(d => `${String(Math.floor(d / 60)).padStart(2, "0")}:00`));
 
       plotArea.append("g")
         .attr("class", "axis")
         .attr("transform", `translate(0, ${innerHeight})`)
         .call(d3.axisBottom(xScale));
 
-      // Day separators
-      plotArea.append("g")
-        .attr("class", "grid")
-        .selectAll("line.day-sep")
-        .data(days)
-        .join("line")
-        .attr("class", "day-sep")
-        .attr("x1", d => xScale(d) + xScale.bandwidth())
-        .attr("x2", d => xScale(d) + xScale.bandwidth())
-        .attr("y1", 0)
-        .attr("y2", innerHeight);
+      // Day separators, likewise a single <path>
+      plotArea.append("path")
+        .attr("class", "grid day-sep")
+        .attr("fill", "none")
+        .attr("stroke", "#e2e8f0")
+        .attr("d", days.map(d => `M${fmt(xScale(d) + xScale.bandwidth())},0V${innerHeight}`).join(""));
 
-      const color = d3.scaleOrdinal(d3.schemeTableau10).domain(doctors.map(d => d.id));
+      // Colors are assigned server-side; a plain object read beats the
+      // ordinal scale's domain-growth path.
+      const colorMap = data._color_map || {};
+      const color = id => colorMap[id] || "#888";
 
       // Controls
       const select = d3.select("#doctorSelect");
       select.selectAll("option")
-        .data([{ id: "ALL", label: "All doctors" }, ...doctors.map(d => ({ id: d.id, label: d.id }))])
+        .data([{ id: "ALL", label: "All doctors" }, ...doctors.map(d => ({ id: d, label: d }))])
         .join("option")
         .attr("value", d => d.id)
         .text(d => d.label);
@@ -183,40 +346,115 @@ HTML_TEMPLATE = """
 
       const slotLayer = plotArea.append("g").attr("class", "slots");
 
-      function renderSlots(selectedId) {
-        const filtered = selectedId === "ALL" ? slots : slots.filter(s => s.doctorId === selectedId);
-        summary.text(`Slots: ${filtered.length} | Doctors: ${selectedId === "ALL" ? doctors.length : 1}`);
-
-        const rects = slotLayer.selectAll("rect").data(filtered, d => `${d.doctorId}-${d.day}-${d.start}-${d.end}`);
+      let hoverIndex = null;
+      let searchR = 0;
 
-        rects.enter()
-          .append("rect")
+      function renderSlots(selectedId) {
+        const selDoc = selectedId === "ALL" ? -1 : doctors.indexOf(selectedId);
+
+        // Sub-pixel slots waste DOM/fill bandwidth; aggregate them per
+        // doctor-day into one translucent span instead.
+        const minPx = +d3.select("#minPx").property("value") || 0;
+        const drawn = [];
+        const skipped = [];
+        let filteredCount = 0;
+        for (let i = 0; i < n; i++) {
+          if (selDoc !== -1 && docIdx[i] !== selDoc) continue;
+          filteredCount++;
+          (yScale(ends[i]) - yScale(starts[i]) >= minPx ? drawn : skipped).push(i);
+        }
+        summary.text(`Slots: ${filteredCount} | Aggregated: ${skipped.length} | Doctors: ${selectedId === "ALL" ? doctors.length : 1}`);
+
+        // One <path> per doctor color instead of one <rect> per slot: the
+        // browser lays out a handful of nodes regardless of slot count.
+        const segsByColor = new Map();
+        for (const i of drawn) {
+          const x = fmt(xOffsets[dayIdx[i]] + dayPadding / 2);
+          const w = fmt(xScale.bandwidth() - dayPadding);
+          const y = fmt(yScale(starts[i]));
+          const h = fmt(Math.max(3, yScale(ends[i]) - yScale(starts[i])));
+          const c = color(doctors[docIdx[i]]);
+          if (!segsByColor.has(c)) segsByColor.set(c, []);
+          segsByColor.get(c).push(`M${x} ${y}h${w}v${h}h${-w}Z`);
+        }
+
+        slotLayer.selectAll("path.slot")
+          .data([...segsByColor.entries()], ([c]) => c)
+          .join("path")
           .attr("class", "slot")
-          .attr("rx", 3)
-          .attr("ry", 3)
-          .attr("x", d => xScale(d.day) + dayPadding / 2)
-          .attr("width", xScale.bandwidth() - dayPadding)
-          .attr("y", d => yScale(d.start))
-          .attr("height", d => Math.max(3, yScale(d.end) - yScale(d.start)))
-          .attr("fill", d => color(d.doctorId))
-          .on("mousemove", (event, d) => {
+          .attr("fill", ([c]) => c)
+          .attr("d", ([, segs]) => segs.join(""));
+
+        // dayIdx is uint8, so doc*256+day is a collision-free bucket key.
+        const buckets = new Map();
+        for (const i of skipped) {
+          const key = docIdx[i] * 256 + dayIdx[i];
+          const b = buckets.get(key);
+          if (b) {
+            b.start = Math.min(b.start, starts[i]);
+            b.end = Math.max(b.end, ends[i]);
+          } else {
+            buckets.set(key, { i, start: starts[i], end: ends[i] });
+          }
+        }
+        const aggSegs = [...buckets.values()].map(b => {
+          const x = fmt(xOffsets[dayIdx[b.i]] + dayPadding / 2);
+          const w = fmt(xScale.bandwidth() - dayPadding);
+          const y = fmt(yScale(b.start));
+          const h = fmt(Math.max(1, yScale(b.end) - yScale(b.start)));
+          return `M${x} ${y}h${w}v${h}h${-w}Z`;
+        });
+        slotLayer.selectAll("path.slot-agg")
+          .data(aggSegs.length ? [aggSegs.join("")] : [])
+          .join("path")
+          .attr("class", "slot-agg")
+          .attr("fill", "#94a3b8")
+          .attr("fill-opacity", 0.35)
+          .attr("d", d => d);
+
+        // The quadtree stores slot indices. The search radius must cover
+        // the largest slot's half-diagonal so a pointer anywhere inside a
+        // rect still reaches its center; the mousemove handler then
+        // confirms actual containment.
+        let maxH = 3;
+        for (const i of drawn) {
+          const h = yScale(ends[i]) - yScale(starts[i]);
+          if (h > maxH) maxH = h;
+        }
+        searchR = Math.hypot(xScale.bandwidth() - dayPadding, maxH) / 2;
+        hoverIndex = d3.quadtree()
+          .x(i => xOffsets[dayIdx[i]] + xScale.bandwidth() / 2)
+          .y(i => (yScale(starts[i]) + yScale(ends[i])) / 2)
+          .addAll(drawn);
+      }
+
+      d3.select("#minPx").on("input", () => renderSlots(select.property("value")));
+
+      chart
+        .on("mousemove", (event) => {
+          const [mx, my] = d3.pointer(event, plotArea.node());
+          // find() returns a slot index; 0 is valid, so test against
+          // undefined. The nearest center is only a candidate -- show the
+          // tooltip when the pointer is actually inside that rect.
+          let i = hoverIndex ? hoverIndex.find(mx, my, searchR) : undefined;
+          if (i !== undefined) {
+            const x = xOffsets[dayIdx[i]] + dayPadding / 2;
+            const w = xScale.bandwidth() - dayPadding;
+            const y = yScale(starts[i]);
+            const h = Math.max(3, yScale(ends[i]) - yScale(starts[i]));
+            if (mx < x || mx > x + w || my < y || my > y + h) i = undefined;
+          }
+          if (i !== undefined) {
             tooltip
               .style("opacity", 0.95)
               .style("left", `${event.pageX + 10}px`)
               .style("top", `${event.pageY + 10}px`)
-              .html(`<strong>${d.doctorId}</strong><br/>${d.day}<br/>${minutesToStr(d.start)} - ${minutesToStr(d.end)}`);
-          })
-          .on("mouseleave", () => tooltip.style("opacity", 0));
-
-        rects
-          .attr("x", d => xScale(d.day) + dayPadding / 2)
-          .attr("width", xScale.bandwidth() - dayPadding)
-          .attr("y", d => yScale(d.start))
-          .attr("height", d => Math.max(3, yScale(d.end) - yScale(d.start)))
-          .attr("fill", d => color(d.doctorId));
-
-        rects.exit().remove();
-      }
+              .html(`<strong>${doctors[docIdx[i]]}</strong><br/>${slotDays[dayIdx[i]]}<br/>${minutesToStr(starts[i])} - ${minutesToStr(ends[i])}`);
+          } else {
+            tooltip.style("opacity", 0);
+          }
+        })
+        .on("mouseleave", () => tooltip.style("opacity", 0));
 
       function minutesToStr(total) {
         const h = Math.floor(total / 60);
@@ -230,7 +468,7 @@ HTML_TEMPLATE = """
         .data(doctors)
         .join("div")
         .attr("class", "legend-item")
-        .html(d => `<span class="legend-swatch" style="background:${color(d.id)}"></span>${d.id}`);
+        .html(d => `<span class="legend-swatch" style="background:${color(d)}"></span>${d}`);
 
       renderSlots("ALL");
     }
@@ -239,6 +477,46 @@ HTML_TEMPLATE = """
 </html>
 """
 
+# Compile once at import; render_template_string would re-parse the ~8KB
+# string per call. Autoescape matches Flask's default for .html templates.
+_TEMPLATE = Template(HTML_TEMPLATE, autoescape=True)
+
+
+def _serve(app: Flask, args: argparse.Namespace) -> None:
+    """Run a concurrent WSGI server; the Werkzeug dev server is one request at a time."""
+    if args.debug or args.serve == "dev":
+        app.run(host=args.host, port=args.port, debug=args.debug)
+        return
+
+    if args.serve == "waitress":
+        try:
+            from waitress import serve
+        except ImportError:
+            print("waitress not installed; falling back to the Flask dev server.", file=sys.stderr)
+            app.run(host=args.host, port=args.port)
+            return
+        serve(app, host=args.host, port=args.port, threads=8)
+        return
+
+    try:  # gunicorn: wrap the in-memory app (there is no importable module:app here)
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print("gunicorn not installed; falling back to the Flask dev server.", file=sys.stderr)
+        app.run(host=args.host, port=args.port)
+        return
+
+    class _Standalone(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{args.host}:{args.port}")
+            self.cfg.set("workers", 4)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("threads", 8)
+
+        def load(self):
+            return app
+
+    _Standalone().run()
+
 
 def main() -> None:
     args = parse_args()
@@ -247,7 +525,7 @@ def main() -> None:
 
     test_case = load_case(args.input)
     app = create_app(test_case)
-    app.run(host=args.host, port=args.port, debug=args.debug)
+    _serve(app, args)
 
 
 if __name__ == "__main__":